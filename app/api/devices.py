@@ -1,34 +1,30 @@
 """Device API endpoints for listing recognized devices and their status."""
 
 import logging
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from app.devices.barcode_scanner import BarcodeScanner
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/devices")
+router = APIRouter(prefix="/devices", default_response_class=ORJSONResponse)
 
-# Will be set during application startup
-_scanner: BarcodeScanner | None = None
 
+def get_scanner(request: Request) -> BarcodeScanner:
+    """Dependency: the scanner bound to app.state at startup."""
+    return request.app.state.scanner
 
-def set_scanner(scanner: BarcodeScanner) -> None:
-    """Set the barcode scanner instance used by the endpoints."""
-    global _scanner  # noqa: PLW0603
-    _scanner = scanner
 
+Scanner = Annotated[BarcodeScanner, Depends(get_scanner)]
 
-def _get_scanner() -> BarcodeScanner:
-    """Get the current scanner or raise an error."""
-    if _scanner is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Scanner not initialized",
-        )
-    return _scanner
+# Rendered GET /devices response, valid while the scanner state version
+# is unchanged (the common case between connect/session transitions).
+_devices_cache: tuple[int, bytes] | None = None
 
 
 # --- Response Models ---
@@ -46,20 +42,51 @@ class DevicesResponse(BaseModel):
     devices: list[DeviceInfo]
 
 
+class ScanEntryModel(BaseModel):
+    barcode: str
+    timestamp: str
+    device: str
+
+
+class ScanHistoryResponse(BaseModel):
+    scans: list[ScanEntryModel]
+    total: int
+
+
 # --- Endpoints ---
 
 
-@router.get("", response_model=DevicesResponse)
-async def list_devices() -> DevicesResponse:
+@router.get("", responses={200: {"model": DevicesResponse}})
+async def list_devices(scanner: Scanner) -> Response:
     """List all recognized devices and their connection status."""
-    scanner = _get_scanner()
-    devices = [
-        DeviceInfo(
-            name=scanner.name,
-            type="barcode_scanner",
-            device_path=scanner.device_path,
-            connected=scanner.is_connected,
-            session_active=scanner.session_active,
-        )
-    ]
-    return DevicesResponse(devices=devices)
+    global _devices_cache  # noqa: PLW0603
+    version = scanner.state_version
+    if _devices_cache is not None and _devices_cache[0] == version:
+        return Response(content=_devices_cache[1], media_type="application/json")
+
+    # Build the response dict directly: skips the Pydantic model
+    # instantiation and jsonable_encoder passes on this hot endpoint.
+    body = orjson.dumps(
+        {
+            "devices": [
+                {
+                    "name": scanner.name,
+                    "type": "barcode_scanner",
+                    "device_path": scanner.device_path,
+                    "connected": scanner.is_connected,
+                    "session_active": scanner.session_active,
+                }
+            ]
+        }
+    )
+    _devices_cache = (version, body)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/scanner/history", responses={200: {"model": ScanHistoryResponse}})
+async def get_scan_history(scanner: Scanner) -> ORJSONResponse:
+    """Return the recent scan history (newest last)."""
+    # The scanner keeps history as pre-shaped dicts, so the list goes
+    # straight to the serializer without building Pydantic objects.
+    scans = scanner.history_dicts
+    return ORJSONResponse(content={"scans": scans, "total": len(scans)})
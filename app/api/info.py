@@ -1,14 +1,22 @@
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
 
 from app.config import settings
 
 router = APIRouter()
 
-
-@router.get("/info")
-async def info() -> dict:
-    """Return device name and application version."""
-    return {
+# The payload is constant for the lifetime of the process; serialize it
+# once at import so the endpoint returns cached bytes with no per-request
+# encoding work.
+_INFO_BYTES = orjson.dumps(
+    {
         "device_name": settings.DEVICE_NAME,
         "version": settings.APP_VERSION,
     }
+)
+
+
+@router.get("/info")
+async def info() -> Response:
+    """Return device name and application version."""
+    return Response(content=_INFO_BYTES, media_type="application/json")
@@ -2,42 +2,38 @@
 
 import asyncio
 import logging
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
+from app.api.devices import Scanner
 from app.services.pos_polling import PosPollingService
 from app.services.settings_store import SettingsStore
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/settings")
+router = APIRouter(prefix="/settings", default_response_class=ORJSONResponse)
 
-# Set during application startup
-_settings_store: SettingsStore | None = None
-_pos_service: PosPollingService | None = None
+# Pre-serialized GET /settings/pos response, invalidated on every update.
+_pos_cache_bytes: bytes | None = None
+_pos_cache_lock = asyncio.Lock()
 
 
-def set_dependencies(
-    settings_store: SettingsStore,
-    pos_service: PosPollingService,
-) -> None:
-    """Inject dependencies from the application lifespan."""
-    global _settings_store, _pos_service  # noqa: PLW0603
-    _settings_store = settings_store
-    _pos_service = pos_service
+def get_store(request: Request) -> SettingsStore:
+    """Dependency: the settings store bound to app.state at startup."""
+    return request.app.state.settings_store
 
 
-def _get_store() -> SettingsStore:
-    if _settings_store is None:
-        raise HTTPException(status_code=503, detail="Settings not initialized")
-    return _settings_store
+def get_pos_service(request: Request) -> PosPollingService:
+    """Dependency: the POS polling service bound to app.state at startup."""
+    return request.app.state.pos_service
 
 
-def _get_pos_service() -> PosPollingService:
-    if _pos_service is None:
-        raise HTTPException(status_code=503, detail="POS service not initialized")
-    return _pos_service
+Store = Annotated[SettingsStore, Depends(get_store)]
+PosService = Annotated[PosPollingService, Depends(get_pos_service)]
 
 
 # --- Request / Response models ---
@@ -75,29 +71,36 @@ class PosTestResponse(BaseModel):
 # --- Endpoints ---
 
 
-@router.get("/pos", response_model=PosSettingsResponse)
-async def get_pos_settings() -> PosSettingsResponse:
+@router.get("/pos", responses={200: {"model": PosSettingsResponse}})
+async def get_pos_settings(store: Store) -> Response:
     """Get current POS connection settings."""
-    store = _get_store()
-    pos = store.pos
-    return PosSettingsResponse(
-        url=pos.url,
-        token_set=bool(pos.token),
-        poll_interval=pos.poll_interval,
-    )
+    global _pos_cache_bytes  # noqa: PLW0603
+    if _pos_cache_bytes is None:
+        async with _pos_cache_lock:
+            if _pos_cache_bytes is None:
+                pos = store.pos
+                _pos_cache_bytes = orjson.dumps(
+                    {
+                        "url": pos.url,
+                        "token_set": bool(pos.token),
+                        "poll_interval": pos.poll_interval,
+                    }
+                )
+    return Response(content=_pos_cache_bytes, media_type="application/json")
 
 
 @router.put("/pos", response_model=PosSettingsResponse)
-async def update_pos_settings(body: PosSettingsUpdate) -> PosSettingsResponse:
+async def update_pos_settings(body: PosSettingsUpdate, store: Store) -> PosSettingsResponse:
     """Update POS connection settings."""
-    store = _get_store()
     updated = store.update_pos(
         url=body.url,
         token=body.token,
         poll_interval=body.poll_interval,
     )
+    global _pos_cache_bytes  # noqa: PLW0603
+    _pos_cache_bytes = None
     logger.info("POS settings updated via API")
-    return PosSettingsResponse(
+    return PosSettingsResponse.model_construct(
         url=updated.url,
         token_set=bool(updated.token),
         poll_interval=updated.poll_interval,
@@ -112,22 +115,19 @@ async def test_pos_connection(body: PosTestRequest) -> PosTestResponse:
         body.url.rstrip("/"),
         body.token,
     )
-    return PosTestResponse(success=success, message=message)
+    return PosTestResponse.model_construct(success=success, message=message)
 
 
-@router.get("/pos/status", response_model=PosStatusResponse)
-async def get_pos_status() -> PosStatusResponse:
+@router.get("/pos/status", responses={200: {"model": PosStatusResponse}})
+async def get_pos_status(service: PosService, scanner: Scanner) -> ORJSONResponse:
     """Get the current POS polling service status."""
-    service = _get_pos_service()
-
-    # Import here to avoid circular imports
-    from app.api.devices import _get_scanner
-
-    scanner = _get_scanner()
-
-    return PosStatusResponse(
-        status=service.status,
-        detail=service.status_detail,
-        session_id=service.current_session_id,
-        scanner_connected=scanner.is_connected,
+    # This endpoint is polled by the dashboard; build the dict directly
+    # so the response skips Pydantic validation and jsonable_encoder.
+    return ORJSONResponse(
+        content={
+            "status": service.status,
+            "detail": service.status_detail,
+            "session_id": service.current_session_id,
+            "scanner_connected": scanner.is_connected,
+        }
     )
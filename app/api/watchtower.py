@@ -1,16 +1,46 @@
 import asyncio
 import logging
-from urllib.error import URLError
-from urllib.request import Request, urlopen
+import time
 
-from fastapi import APIRouter
+import httpx
+import orjson
+from fastapi import APIRouter, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/watchtower")
+router = APIRouter(prefix="/watchtower", default_response_class=ORJSONResponse)
+
+# TTL cache for the status response: the dashboard polls this endpoint,
+# and each miss costs a Watchtower HTTP round-trip (up to 3s timeout).
+_CACHE_TTL = max(1.0, settings.WATCHTOWER_INTERVAL / 2)
+_cache: tuple[float, bytes] | None = None
+_cache_lock = asyncio.Lock()
+
+# Shared keep-alive client: created in the application lifespan so the
+# TCP connection to Watchtower is reused across requests.
+_client: httpx.AsyncClient | None = None
+
+
+def open_client() -> None:
+    """Create the shared Watchtower HTTP client (called at startup)."""
+    global _client  # noqa: PLW0603
+    _client = httpx.AsyncClient(
+        timeout=3.0,
+        headers={"Authorization": f"Bearer {settings.WATCHTOWER_TOKEN}"},
+        limits=httpx.Limits(max_keepalive_connections=4),
+    )
+
+
+async def close_client() -> None:
+    """Close the shared Watchtower HTTP client (called at shutdown)."""
+    global _client  # noqa: PLW0603
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 class WatchtowerStatus(BaseModel):
@@ -20,52 +50,81 @@ class WatchtowerStatus(BaseModel):
     containers_updated: int | None = None
 
 
-def _parse_prometheus_metric(text: str, metric_name: str) -> int | None:
-    """Extract a metric value from Prometheus-style text output."""
-    for line in text.splitlines():
-        line = line.strip()
-        if line.startswith("#"):
+# Metrics extracted from the Watchtower Prometheus output
+_WANTED_METRICS = frozenset(
+    {
+        "watchtower_containers_scanned",
+        "watchtower_containers_updated",
+    }
+)
+
+
+def _parse_prometheus_many(text: str, names: frozenset[str]) -> dict[str, int]:
+    """Extract several metric values from Prometheus-style text in one pass.
+
+    Args:
+        text: Raw Prometheus exposition output.
+        names: Metric names to extract.
+
+    Returns:
+        Mapping of metric name to integer value for the metrics found.
+    """
+    out: dict[str, int] = {}
+    # No per-line strip: Prometheus lines carry no leading whitespace,
+    # and float() tolerates a trailing \r from CRLF bodies.
+    for line in text.split("\n"):
+        if not line or line[0] == "#":
             continue
-        if line.startswith(metric_name):
-            parts = line.split()
-            if len(parts) >= 2:
-                try:
-                    return int(float(parts[-1]))
-                except ValueError:
-                    pass
-    return None
-
-
-def _fetch_watchtower_metrics() -> WatchtowerStatus:
-    """Blocking call to query Watchtower HTTP API. Runs in a thread."""
+        key, _, rest = line.partition(" ")
+        # Strip any label set so "name{...}" still matches
+        key = key.partition("{")[0]
+        if key in names and rest:
+            try:
+                out[key] = int(float(rest.rsplit(" ", 1)[-1]))
+            except ValueError:
+                pass
+    return out
+
+
+async def _fetch_watchtower_metrics() -> WatchtowerStatus:
+    """Query the Watchtower HTTP API over the shared keep-alive client."""
     url = f"{settings.WATCHTOWER_URL}/v1/metrics"
-    token = settings.WATCHTOWER_TOKEN
 
     try:
-        req = Request(url)
-        req.add_header("Authorization", f"Bearer {token}")
-        with urlopen(req, timeout=3) as resp:
-            body = resp.read().decode("utf-8")
-
-        scanned = _parse_prometheus_metric(body, "watchtower_containers_scanned")
-        updated = _parse_prometheus_metric(body, "watchtower_containers_updated")
+        resp = await _client.get(url)
+        metrics = _parse_prometheus_many(resp.text, _WANTED_METRICS)
 
-        return WatchtowerStatus(
+        # Internal values; model_construct skips field validation.
+        return WatchtowerStatus.model_construct(
             running=True,
             interval=settings.WATCHTOWER_INTERVAL,
-            containers_scanned=scanned,
-            containers_updated=updated,
+            containers_scanned=metrics.get("watchtower_containers_scanned"),
+            containers_updated=metrics.get("watchtower_containers_updated"),
         )
 
-    except (URLError, OSError, TimeoutError) as exc:
+    except (httpx.HTTPError, OSError) as exc:
         logger.debug("Watchtower not reachable: %s", exc)
-        return WatchtowerStatus(
+        return WatchtowerStatus.model_construct(
             running=False,
             interval=settings.WATCHTOWER_INTERVAL,
         )
 
 
-@router.get("/status", response_model=WatchtowerStatus)
-async def watchtower_status() -> WatchtowerStatus:
-    """Query the Watchtower HTTP API for status and metrics."""
-    return await asyncio.to_thread(_fetch_watchtower_metrics)
+@router.get("/status", responses={200: {"model": WatchtowerStatus}})
+async def watchtower_status() -> Response:
+    """Query the Watchtower HTTP API for status and metrics (TTL-cached)."""
+    global _cache  # noqa: PLW0603
+    now = time.monotonic()
+    if _cache is not None and now - _cache[0] < _CACHE_TTL:
+        return Response(content=_cache[1], media_type="application/json")
+
+    async with _cache_lock:
+        # Re-check: another request may have refreshed while we waited.
+        now = time.monotonic()
+        if _cache is not None and now - _cache[0] < _CACHE_TTL:
+            return Response(content=_cache[1], media_type="application/json")
+
+        status = await _fetch_watchtower_metrics()
+        body = orjson.dumps(status.model_dump())
+        _cache = (time.monotonic(), body)
+        return Response(content=body, media_type="application/json")
@@ -2,26 +2,26 @@
 
 The scanner thread always runs for device auto-discovery (so the GUI
 can show connection status), but only reads barcodes when a POS scan
-session is active.  When no session is active, the HID buffer is
-periodically flushed so stale data does not leak into the next session.
+session is active.  When no session is active, incoming HID reports are
+discarded as they arrive so stale data does not leak into the next
+session.
 """
 
 import logging
+import os
+import queue
+import select
 import threading
 import time
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass, field
-from datetime import datetime
-from pathlib import Path
 
 from app.devices.hid_reader import (
+    ACTION_ENTER,
     HID_REPORT_SIZE,
-    SCANCODE_ENTER,
     SHIFT_MASK,
-    _SCANCODE_MAP,
-    _SCANCODE_MAP_SHIFTED,
-    flush_buffer,
-    read_report_with_timeout,
+    _SCANCODE_ACTION,
 )
 from app.devices.usb_discovery import find_barcode_scanner
 
@@ -30,11 +30,24 @@ logger = logging.getLogger(__name__)
 # How often to re-scan for the device when not connected (seconds)
 DISCOVERY_INTERVAL = 3
 
-# How often to check for session changes when device is connected but idle
-IDLE_CHECK_INTERVAL = 0.5
+# Maximum number of scans kept in the in-memory history
+MAX_HISTORY = 500
 
+# Timestamps are second-resolution, so scans within the same second can
+# share one formatted string: [epoch_second, formatted]
+_ts_cache: list = [0, ""]
 
-@dataclass
+
+def _now_iso() -> str:
+    """Current local time as YYYY-MM-DDTHH:MM:SS, cached per second."""
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        _ts_cache[0] = t
+        _ts_cache[1] = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t))
+    return _ts_cache[1]
+
+
+@dataclass(slots=True, frozen=True)
 class ScanEntry:
     """A single barcode scan result."""
 
@@ -43,7 +56,7 @@ class ScanEntry:
     device: str
 
 
-@dataclass
+@dataclass(slots=True)
 class BarcodeScanner:
     """Manages a USB barcode scanner with auto-discovery and session-based reading."""
 
@@ -51,36 +64,76 @@ class BarcodeScanner:
     _thread: threading.Thread | None = field(default=None, init=False, repr=False)
     _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
     _connected: bool = field(default=False, init=False, repr=False)
+    # Bumped on every externally visible state change; lets API caches
+    # detect "nothing changed" without rebuilding the response.
+    _state_version: int = field(default=0, init=False, repr=False)
     _device_path: str | None = field(default=None, init=False, repr=False)
     _device_name: str = field(default="Barcode Scanner", init=False, repr=False)
 
-    # Session state
-    _session_active: bool = field(default=False, init=False, repr=False)
-    _session_id: str | None = field(default=None, init=False, repr=False)
-    _on_barcode: Callable[[ScanEntry], None] | None = field(
+    # Session state as one immutable (session_id, on_barcode) snapshot.
+    # Assignment is atomic under the GIL, so readers never need the lock:
+    # they grab the tuple once and see a consistent pair.
+    _session: tuple[str, Callable[[ScanEntry], None]] | None = field(
+        default=None, init=False, repr=False
+    )
+    # Self-pipe used to wake the reader out of its select() wait the
+    # moment a session starts/stops or the scanner shuts down.
+    _wake_r: int = field(default=-1, init=False, repr=False)
+    _wake_w: int = field(default=-1, init=False, repr=False)
+
+    # Scans are handed to callbacks on a separate dispatcher thread so a
+    # slow callback (e.g. an HTTPS POST to the POS) never stalls HID
+    # reads during rapid scanning.
+    _cb_queue: queue.SimpleQueue = field(
+        default_factory=queue.SimpleQueue, init=False, repr=False
+    )
+    _dispatch_thread: threading.Thread | None = field(
         default=None, init=False, repr=False
     )
 
+    # Scan history kept as pre-shaped dicts so the history endpoint can
+    # hand the list straight to the JSON serializer without re-iterating.
+    _history: deque = field(
+        default_factory=lambda: deque(maxlen=MAX_HISTORY), init=False, repr=False
+    )
+
     def start(self) -> None:
         """Start the background scanner thread."""
         if self._running:
             return
         self._running = True
+        self._wake_r, self._wake_w = os.pipe()
         self._thread = threading.Thread(
             target=self._scan_loop,
             daemon=True,
             name="barcode-scanner",
         )
         self._thread.start()
+        self._dispatch_thread = threading.Thread(
+            target=self._dispatch_loop,
+            daemon=True,
+            name="barcode-dispatch",
+        )
+        self._dispatch_thread.start()
         logger.info("Barcode scanner thread started (auto-discovery active)")
 
     def stop(self) -> None:
         """Stop the background scanner thread."""
         self._running = False
+        # Wake the thread if it is parked in the select() wait
+        self._wake()
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=3)
+        self._cb_queue.put(None)  # sentinel: stop the dispatcher
+        if self._dispatch_thread and self._dispatch_thread.is_alive():
+            self._dispatch_thread.join(timeout=3)
+        if self._wake_r != -1:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = -1
         self._connected = False
-        self._session_active = False
+        self._session = None
+        self._state_version += 1
         logger.info("Barcode scanner stopped")
 
     # --- Session control ---
@@ -98,22 +151,46 @@ class BarcodeScanner:
             session_id: Unique session identifier from the POS system.
             on_barcode: Callback invoked with each ScanEntry.
         """
-        with self._lock:
-            self._session_id = session_id
-            self._on_barcode = on_barcode
-            self._session_active = True
+        self._session = (session_id, on_barcode)
+        self._state_version += 1
+        self._wake()
         logger.info("Scan session activated: %s", session_id)
 
     def deactivate_session(self) -> None:
         """Deactivate the current scan session."""
-        with self._lock:
-            was_active = self._session_active
-            self._session_active = False
-            self._session_id = None
-            self._on_barcode = None
+        was_active = self._session is not None
+        self._session = None
         if was_active:
+            self._state_version += 1
+            self._wake()
             logger.info("Scan session deactivated")
 
+    def _dispatch_loop(self) -> None:
+        """Deliver queued scans to their callbacks off the reader thread."""
+        while True:
+            item = self._cb_queue.get()
+            if item is None:
+                return
+            callback, entry = item
+            try:
+                callback(entry)
+            except Exception:
+                logger.exception("Barcode callback error")
+
+    def _wake(self) -> None:
+        """Nudge the reader thread out of its select() wait."""
+        if self._wake_w != -1:
+            try:
+                os.write(self._wake_w, b"\x00")
+            except OSError:
+                pass
+
+    def _interruptible_sleep(self, seconds: float) -> None:
+        """Sleep that a wake (session change, stop) cuts short."""
+        ready, _, _ = select.select([self._wake_r], [], [], seconds)
+        if ready:
+            os.read(self._wake_r, 64)
+
     # --- Properties ---
 
     @property
@@ -134,12 +211,24 @@ class BarcodeScanner:
     @property
     def session_active(self) -> bool:
         """Whether a scan session is currently active."""
-        return self._session_active
+        return self._session is not None
 
     @property
     def session_id(self) -> str | None:
         """Current session ID, or None."""
-        return self._session_id
+        session = self._session
+        return session[0] if session is not None else None
+
+    @property
+    def state_version(self) -> int:
+        """Monotonic counter incremented on every state transition."""
+        return self._state_version
+
+    @property
+    def history_dicts(self) -> list[dict]:
+        """Snapshot of the scan history as JSON-ready dicts (newest last)."""
+        with self._lock:
+            return list(self._history)
 
     # --- Background loop ---
 
@@ -155,12 +244,14 @@ class BarcodeScanner:
                         logger.warning("Scanner disconnected")
                         self._connected = False
                         self._device_path = None
-                    time.sleep(DISCOVERY_INTERVAL)
+                        self._state_version += 1
+                    self._interruptible_sleep(DISCOVERY_INTERVAL)
                     continue
 
                 self._device_path = discovered.hidraw_path
                 self._device_name = discovered.name
                 self._connected = True
+                self._state_version += 1
                 logger.info(
                     "Scanner found: %s at %s",
                     discovered.name,
@@ -176,92 +267,127 @@ class BarcodeScanner:
                     self._device_path,
                 )
                 self._connected = False
-                time.sleep(5)
-            except Exception as exc:
-                logger.error("Scanner error: %s", exc)
+                self._state_version += 1
+                self._interruptible_sleep(5)
+            except Exception:
+                logger.exception("Scanner error")
                 self._connected = False
-                time.sleep(DISCOVERY_INTERVAL)
+                self._state_version += 1
+                self._interruptible_sleep(DISCOVERY_INTERVAL)
 
     def _manage_device(self, device_path: str) -> None:
         """Keep the HID device open; read barcodes only during active sessions.
 
-        This method holds the device file open so we can:
-        - Flush stale data when idle
-        - Immediately start reading when a session becomes active
+        The raw fd (no BufferedReader) is polled together with the wake
+        pipe in one poll() call, so we can:
+        - Discard stale reports as they arrive when idle
+        - Start reading the instant a session becomes active
         - Detect device disconnects promptly
+
+        Reading via os.read keeps reports out of a userland buffer, so
+        nothing can sit hidden across session boundaries.
         """
         logger.info("Managing scanner device %s", device_path)
 
+        fd = -1
         try:
-            with open(device_path, "rb") as device:
-                barcode_chars: list[str] = []
-
-                while self._running:
-                    # Check device still exists
-                    if not Path(device_path).exists():
-                        logger.warning("Scanner device %s lost", device_path)
-                        self._connected = False
-                        self._device_path = None
-                        return
-
-                    if not self._session_active:
-                        # No active session: flush any buffered data and wait
-                        flushed = flush_buffer(device)
-                        if flushed > 0:
-                            logger.debug("Flushed %d stale HID reports", flushed)
-                        barcode_chars.clear()
-                        time.sleep(IDLE_CHECK_INTERVAL)
-                        continue
+            fd = os.open(device_path, os.O_RDONLY | os.O_NONBLOCK)
+            poller = select.poll()
+            poller.register(fd, select.POLLIN)
+            poller.register(self._wake_r, select.POLLIN)
+
+            # Hoist loop invariants into locals: the inner loop runs per
+            # HID report and LOAD_FAST beats attribute/global lookups
+            wake_r = self._wake_r
+            report_size = HID_REPORT_SIZE
+            action_table = _SCANCODE_ACTION
+            poll_wait = poller.poll
+
+            # Preallocated scratch buffer + write index: long 2D
+            # payloads append without growth reallocations
+            barcode_buf = bytearray(512)
+            buf_len = 0
+
+            while self._running:
+                # No periodic existence stat: an unplugged hidraw fd
+                # turns readable and the read then fails, which the
+                # OSError handler below maps to a disconnect. One wait
+                # covers the device and the wake pipe: zero wakeups
+                # while idle, instant reaction to session changes.
+                events = poll_wait(1000)
+
+                dev_ready = False
+                for event_fd, _event in events:
+                    if event_fd == wake_r:
+                        os.read(wake_r, 64)  # drain, state re-read below
+                    else:
+                        dev_ready = True
+
+                if not dev_ready:
+                    continue
 
-                    # Session is active: read with timeout
-                    report = read_report_with_timeout(device, timeout=1.0)
-
-                    if report is None:
-                        # Timeout or disconnect -- check if device still exists
-                        if not Path(device_path).exists():
-                            logger.warning("Scanner device %s lost during read", device_path)
-                            self._connected = False
-                            self._device_path = None
-                            return
-                        # Just a timeout, loop back to check flags
-                        continue
+                # Drain the whole burst in one syscall: a fast 2D
+                # scanner delivers 100+ reports in a few ms, and paying
+                # one read per 8-byte report costs a syscall each
+                try:
+                    data = os.read(fd, report_size * 64)
+                except BlockingIOError:
+                    continue
+                if len(data) < report_size:
+                    # EOF/short read after readiness: the device is gone
+                    logger.warning("Scanner device %s lost", device_path)
+                    self._connected = False
+                    self._device_path = None
+                    self._state_version += 1
+                    return
+
+                session = self._session
+                if session is None:
+                    # Stale batch outside a session: discard it so it
+                    # cannot leak into the next session
+                    buf_len = 0
+                    continue
 
-                    modifier = report[0]
-                    scancode = report[2]
+                for off in range(0, len(data) - report_size + 1, report_size):
+                    # One lookup classifies the report: ignore (key
+                    # release/unmapped), Enter, or an ASCII byte
+                    action = action_table[
+                        (256 if data[off] & SHIFT_MASK else 0) | data[off + 2]
+                    ]
 
-                    # Skip key release reports
-                    if scancode == 0:
+                    if action == 0:
                         continue
 
                     # Enter key = barcode complete
-                    if scancode == SCANCODE_ENTER:
-                        barcode = "".join(barcode_chars).strip()
-                        barcode_chars.clear()
+                    if action == ACTION_ENTER:
+                        barcode = barcode_buf[:buf_len].decode("ascii").strip()
+                        buf_len = 0
 
                         if barcode:
                             entry = ScanEntry(
                                 barcode=barcode,
-                                timestamp=datetime.now().isoformat(timespec="seconds"),
+                                timestamp=_now_iso(),
                                 device=self._device_name,
                             )
                             logger.info("Barcode scanned: %s", barcode)
 
-                            # Forward via callback
+                            # Record in history and queue for dispatch;
+                            # SimpleQueue.put never blocks the reader
                             with self._lock:
-                                callback = self._on_barcode
-                            if callback:
-                                try:
-                                    callback(entry)
-                                except Exception as exc:
-                                    logger.error("Barcode callback error: %s", exc)
+                                self._history.append(
+                                    {
+                                        "barcode": entry.barcode,
+                                        "timestamp": entry.timestamp,
+                                        "device": entry.device,
+                                    }
+                                )
+                            self._cb_queue.put((session[1], entry))
                         continue
 
-                    # Decode character
-                    shifted = bool(modifier & SHIFT_MASK)
-                    char_map = _SCANCODE_MAP_SHIFTED if shifted else _SCANCODE_MAP
-                    char = char_map.get(scancode)
-                    if char:
-                        barcode_chars.append(char)
+                    if buf_len == len(barcode_buf):
+                        barcode_buf.extend(bytes(len(barcode_buf)))
+                    barcode_buf[buf_len] = action
+                    buf_len += 1
 
         except PermissionError:
             logger.error(
@@ -270,7 +396,12 @@ class BarcodeScanner:
             )
             self._connected = False
             self._device_path = None
+            self._state_version += 1
         except OSError as exc:
             logger.warning("Scanner device error: %s", exc)
             self._connected = False
             self._device_path = None
+            self._state_version += 1
+        finally:
+            if fd != -1:
+                os.close(fd)
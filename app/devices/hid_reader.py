@@ -8,6 +8,7 @@ flush utility for session-based scanning.
 """
 
 import logging
+import os
 import select
 from typing import BinaryIO
 
@@ -52,6 +53,28 @@ SCANCODE_ENTER = 0x28
 # Shift modifier bitmask (left shift = bit 1, right shift = bit 5)
 SHIFT_MASK = 0x22
 
+# Flat decode table indexed by (shift << 8) | scancode. Collapses the
+# per-report "pick a dict, then dict.get" into one tuple index; unmapped
+# scancodes decode to "" (falsy, so callers can keep `if char:`).
+_SCANCODE_LUT: tuple[str, ...] = tuple(
+    (_SCANCODE_MAP_SHIFTED if shifted else _SCANCODE_MAP).get(code, "")
+    for shifted in (0, 1)
+    for code in range(256)
+)
+
+# Same table as raw ASCII bytes (0 = unmapped). Hot loops append these
+# into a bytearray, avoiding one small str allocation per character.
+_SCANCODE_LUT_BYTES: bytes = bytes(ord(c) if c else 0 for c in _SCANCODE_LUT)
+
+# Action table for the scanner hot loop: 0 = ignore (key release or
+# unmapped), ACTION_ENTER = barcode complete, anything else = the ASCII
+# byte to append. One lookup classifies the report with a single branch.
+ACTION_ENTER = 0xFF  # not valid ASCII, safe as a sentinel
+_SCANCODE_ACTION: bytes = bytes(
+    ACTION_ENTER if (i & 0xFF) == SCANCODE_ENTER else b
+    for i, b in enumerate(_SCANCODE_LUT_BYTES)
+)
+
 
 def _decode_report(data: bytes) -> str | None:
     """Decode a single HID report into a character.
@@ -74,9 +97,8 @@ def _decode_report(data: bytes) -> str | None:
     if scancode == SCANCODE_ENTER:
         return None
 
-    shifted = bool(modifier & SHIFT_MASK)
-    char_map = _SCANCODE_MAP_SHIFTED if shifted else _SCANCODE_MAP
-    return char_map.get(scancode)
+    char = _SCANCODE_LUT[(256 if modifier & SHIFT_MASK else 0) | scancode]
+    return char or None
 
 
 def read_barcode(device_path: str) -> str | None:
@@ -95,31 +117,45 @@ def read_barcode(device_path: str) -> str | None:
         PermissionError: If the device cannot be opened.
         OSError: If the device is lost during reading.
     """
-    barcode_chars: list[str] = []
-
-    with open(device_path, "rb") as device:
+    barcode_buf = bytearray()
+    # Reusable read buffer: readv fills it in place, so draining a burst
+    # allocates nothing instead of one fresh bytes object per read
+    data = bytearray(HID_REPORT_SIZE * 32)
+    read_bufs = [memoryview(data)]
+
+    fd = os.open(device_path, os.O_RDONLY | os.O_NONBLOCK)
+    try:
         while True:
-            data = device.read(HID_REPORT_SIZE)
+            # Park in select() until reports arrive, then drain the
+            # whole burst in one read instead of one syscall per report
+            select.select([fd], [], [])
+            try:
+                n = os.readv(fd, read_bufs)
+            except BlockingIOError:
+                continue
 
-            if not data or len(data) < HID_REPORT_SIZE:
+            if n < HID_REPORT_SIZE:
                 return None
 
-            modifier = data[0]
-            scancode = data[2]
+            for off in range(0, n - HID_REPORT_SIZE + 1, HID_REPORT_SIZE):
+                modifier = data[off]
+                scancode = data[off + 2]
 
-            if scancode == 0:
-                continue
+                if scancode == 0:
+                    continue
 
-            if scancode == SCANCODE_ENTER:
-                result = "".join(barcode_chars)
-                return result if result else None
+                if scancode == SCANCODE_ENTER:
+                    result = barcode_buf.decode("ascii")
+                    return result if result else None
 
-            shifted = bool(modifier & SHIFT_MASK)
-            char_map = _SCANCODE_MAP_SHIFTED if shifted else _SCANCODE_MAP
-            char = char_map.get(scancode)
+                byte = _SCANCODE_LUT_BYTES[
+                    (256 if modifier & SHIFT_MASK else 0) | scancode
+                ]
 
-            if char:
-                barcode_chars.append(char)
+                if byte:
+                    barcode_buf.append(byte)
+    finally:
+        os.close(fd)
 
 
 def flush_buffer(device: BinaryIO) -> int:
@@ -139,10 +175,18 @@ def flush_buffer(device: BinaryIO) -> int:
         ready, _, _ = select.select([fd], [], [], 0)
         if not ready:
             break
-        data = device.read(HID_REPORT_SIZE)
+        # Drain everything available in one large read instead of one
+        # syscall per 8-byte report. os.read on the raw fd returns
+        # whatever is pending right now; BufferedReader.read(n) would
+        # keep blocking until it has collected n bytes, which a live
+        # hidraw device never delivers.
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            break
         if not data:
             break
-        flushed += 1
+        flushed += len(data) // HID_REPORT_SIZE
     return flushed
 
 
@@ -5,12 +5,12 @@ IDs and returns the corresponding /dev/hidraw* path.
 """
 
 import logging
+import os
 from dataclasses import dataclass
-from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
-SYSFS_HIDRAW = Path("/sys/class/hidraw")
+SYSFS_HIDRAW = "/sys/class/hidraw"
 
 
 @dataclass(frozen=True)
@@ -35,6 +35,13 @@ KNOWN_DEVICES: list[KnownDevice] = [
 ]
 
 
+# Lookup from (vendor_id, product_id) to registry entry, built once at
+# import instead of per discovery call.
+_KNOWN_LOOKUP: dict[tuple[str, str], KnownDevice] = {
+    (d.vendor_id, d.product_id): d for d in KNOWN_DEVICES
+}
+
+
 @dataclass(frozen=True)
 class DiscoveredDevice:
     """A discovered USB device with its /dev path."""
@@ -46,12 +53,24 @@ class DiscoveredDevice:
     device_type: str
 
 
-def _read_sysfs_attr(path: Path) -> str | None:
-    """Read a single-line sysfs attribute file."""
+def _read_sysfs_attr(path: str) -> str | None:
+    """Read a single-line sysfs attribute file.
+
+    Raw os.open/os.read instead of Path.read_text: sysfs attributes are
+    tiny, and the discovery walk is syscall-bound, so each read costs
+    exactly open+read+close with no file-object or Path allocation.
+    """
     try:
-        return path.read_text().strip()
-    except (OSError, PermissionError):
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        data = os.read(fd, 32)
+    except OSError:
         return None
+    finally:
+        os.close(fd)
+    return data.strip().decode()
 
 
 def _find_usb_ids_for_hidraw(hidraw_name: str) -> tuple[str, str] | None:
@@ -63,30 +82,34 @@ def _find_usb_ids_for_hidraw(hidraw_name: str) -> tuple[str, str] | None:
     Returns:
         Tuple of (vendor_id, product_id) in lowercase hex, or None if not found.
     """
-    sysfs_path = SYSFS_HIDRAW / hidraw_name
-
-    if not sysfs_path.exists():
-        return None
-
-    # Resolve the real path and walk up the directory tree
+    # Fast path: for a USB HID device the interface sits two levels below
+    # the USB device node, so the ids live at a fixed relative offset.
+    # open() resolves the device symlink and the ".." components itself.
+    vendor = _read_sysfs_attr(f"{SYSFS_HIDRAW}/{hidraw_name}/device/../../idVendor")
+    if vendor:
+        product = _read_sysfs_attr(
+            f"{SYSFS_HIDRAW}/{hidraw_name}/device/../../idProduct"
+        )
+        if product:
+            return (vendor.lower(), product.lower())
+
+    # Fallback: resolve the real path and walk up the directory tree
     # looking for idVendor and idProduct files (present at the USB device level)
     try:
-        real_path = sysfs_path.resolve()
+        current = os.path.realpath(f"{SYSFS_HIDRAW}/{hidraw_name}", strict=True)
     except OSError:
         return None
 
-    current = real_path
     for _ in range(10):  # limit traversal depth
-        vendor_file = current / "idVendor"
-        product_file = current / "idProduct"
-
-        if vendor_file.exists() and product_file.exists():
-            vendor = _read_sysfs_attr(vendor_file)
-            product = _read_sysfs_attr(product_file)
-            if vendor and product:
+        # Attempt the reads directly instead of exists() checks: one
+        # failed open per level beats two stat() calls per level
+        vendor = _read_sysfs_attr(f"{current}/idVendor")
+        if vendor is not None:
+            product = _read_sysfs_attr(f"{current}/idProduct")
+            if product:
                 return (vendor.lower(), product.lower())
 
-        parent = current.parent
+        parent = os.path.dirname(current)
         if parent == current:
             break
         current = parent
@@ -94,36 +117,43 @@ def _find_usb_ids_for_hidraw(hidraw_name: str) -> tuple[str, str] | None:
     return None
 
 
+# Discovery result memoized on the sysfs directory mtime: hotplug
+# changes the mtime, so a stable answer costs one stat() per call
+# instead of re-walking every hidraw entry.
+_cache: tuple[int, list[DiscoveredDevice]] | None = None
+
+
 def discover_devices() -> list[DiscoveredDevice]:
     """Scan all hidraw devices and return those matching known USB IDs.
 
     Returns:
         List of discovered devices with their /dev paths and metadata.
     """
+    global _cache  # noqa: PLW0603
     discovered: list[DiscoveredDevice] = []
 
-    if not SYSFS_HIDRAW.exists():
+    try:
+        mtime = os.stat(SYSFS_HIDRAW).st_mtime_ns
+    except OSError:
         logger.debug("sysfs hidraw path %s does not exist", SYSFS_HIDRAW)
         return discovered
 
-    # Build a lookup dict from known devices
-    known_lookup: dict[tuple[str, str], KnownDevice] = {
-        (d.vendor_id, d.product_id): d for d in KNOWN_DEVICES
-    }
+    if _cache is not None and _cache[0] == mtime:
+        return _cache[1]
 
     try:
-        hidraw_entries = sorted(SYSFS_HIDRAW.iterdir())
+        with os.scandir(SYSFS_HIDRAW) as entries:
+            hidraw_names = sorted(entry.name for entry in entries)
     except OSError:
         return discovered
 
-    for entry in hidraw_entries:
-        hidraw_name = entry.name  # e.g. "hidraw0"
+    for hidraw_name in hidraw_names:  # e.g. "hidraw0"
         ids = _find_usb_ids_for_hidraw(hidraw_name)
 
         if ids is None:
             continue
 
-        known = known_lookup.get(ids)
+        known = _KNOWN_LOOKUP.get(ids)
         if known is not None:
             dev_path = f"/dev/{hidraw_name}"
             device = DiscoveredDevice(
@@ -145,6 +175,7 @@ def discover_devices() -> list[DiscoveredDevice]:
     if not discovered:
         logger.info("No known USB devices found")
 
+    _cache = (mtime, discovered)
     return discovered
 
 
@@ -1,23 +1,57 @@
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# Background listener that drains the log queue; kept at module scope so
+# shutdown_logging can flush and stop it.
+_listener: QueueListener | None = None
 
 
 def setup_logging(level: str = "INFO") -> None:
     """Configure application-wide logging.
 
+    Log records are enqueued by the emitting thread and written to stdout
+    by a background listener, so a slow/blocked stdout never stalls the
+    scanner or request threads.
+
     Args:
         level: Log level string (DEBUG, INFO, WARNING, ERROR, CRITICAL).
     """
+    global _listener  # noqa: PLW0603
     numeric_level = getattr(logging, level.upper(), logging.INFO)
 
-    logging.basicConfig(
-        level=numeric_level,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-        ],
+    # Build the handler explicitly: an explicit datefmt skips the default
+    # formatter's msec suffix formatting per record, and validate=False
+    # skips the style re-validation pass on the format string.
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        logging.Formatter(
+            fmt="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+            validate=False,
+        )
     )
 
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # Message-only formatter: prepare() must not pre-format the record,
+    # the listener-side handler owns the final layout. Without this,
+    # basicConfig would attach its BASIC_FORMAT formatter and records
+    # would be formatted twice.
+    queue_handler.setFormatter(logging.Formatter("%(message)s", validate=False))
+    logging.basicConfig(level=numeric_level, handlers=[queue_handler])
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+
     # Reduce noise from third-party loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+
+def shutdown_logging() -> None:
+    """Flush queued log records and stop the background listener."""
+    global _listener  # noqa: PLW0603
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -4,13 +4,13 @@ from pathlib import Path
 from typing import AsyncIterator
 
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api import devices, health, info, settings, watchtower
 from app.config import settings as app_settings
 from app.devices.barcode_scanner import BarcodeScanner
-from app.logging_config import setup_logging
+from app.logging_config import setup_logging, shutdown_logging
 from app.services.pos_polling import PosPollingService
 from app.services.settings_store import SettingsStore
 
@@ -36,7 +36,6 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Initialize barcode scanner (device discovery + session-based reading)
     scanner = BarcodeScanner()
     scanner.start()
-    devices.set_scanner(scanner)
 
     # Initialize POS polling service
     pos_service = PosPollingService(
@@ -45,21 +44,31 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     )
     pos_service.start()
 
-    # Inject dependencies into settings API
-    settings.set_dependencies(settings_store, pos_service)
+    # Bind shared services to app.state; routers access them via Depends
+    app.state.scanner = scanner
+    app.state.settings_store = settings_store
+    app.state.pos_service = pos_service
+
+    # Shared HTTP client for Watchtower status queries
+    watchtower.open_client()
 
     yield
 
     # Shutdown
+    await watchtower.close_client()
     pos_service.stop()
     scanner.stop()
     logger.info("Shutdown complete")
+    shutdown_logging()
 
 
 app = FastAPI(
     title=app_settings.DEVICE_NAME,
     version=app_settings.APP_VERSION,
     lifespan=lifespan,
+    # orjson serializes responses in a single C-level pass instead of
+    # jsonable_encoder + stdlib json.dumps
+    default_response_class=ORJSONResponse,
 )
 
 app.include_router(health.router)
@@ -8,10 +8,13 @@ Thread-safe: all reads and writes are protected by a lock.
 
 import json
 import logging
+import os
 import threading
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 # Default path inside the container (mapped to a Docker volume)
@@ -40,7 +43,16 @@ class SettingsStore:
     def __init__(self, path: Path | None = None) -> None:
         self._path = path or DEFAULT_SETTINGS_PATH
         self._lock = threading.Lock()
+        # Separate lock for disk writes: serializes writers against each
+        # other without making readers wait out SD-card latency
+        self._io_lock = threading.Lock()
+        # The data dir only needs creating once per process; skipping
+        # the mkdir afterwards saves a stat on every save
+        self._dir_created = False
         self._settings = AppSettings()
+        # Bumped on every mutation; readers can skip re-snapshotting
+        # (and re-locking) when the version has not moved.
+        self._version = 0
         self._load()
 
     def _load(self) -> None:
@@ -63,15 +75,51 @@ class SettingsStore:
         except (json.JSONDecodeError, ValueError, TypeError) as exc:
             logger.warning("Failed to load settings from %s: %s", self._path, exc)
 
-    def _save(self) -> None:
-        """Persist current settings to disk."""
-        try:
-            self._path.parent.mkdir(parents=True, exist_ok=True)
-            data = json.dumps(asdict(self._settings), indent=2, ensure_ascii=False)
-            self._path.write_text(data, encoding="utf-8")
-            logger.info("Settings saved to %s", self._path)
-        except OSError as exc:
-            logger.error("Failed to save settings to %s: %s", self._path, exc)
+    def _to_dict(self) -> dict:
+        """Build the on-disk dict by hand (caller holds self._lock).
+
+        asdict() would recursively copy the whole dataclass tree.
+        """
+        pos = self._settings.pos
+        return {
+            "pos": {
+                "url": pos.url,
+                "token": pos.token,
+                "poll_interval": pos.poll_interval,
+            },
+        }
+
+    def _write(self, data: dict) -> None:
+        """Persist a settings snapshot to disk (atomically).
+
+        Runs outside self._lock so disk latency never stalls readers;
+        self._io_lock keeps concurrent writers in order.
+        """
+        with self._io_lock:
+            try:
+                if not self._dir_created:
+                    self._path.parent.mkdir(parents=True, exist_ok=True)
+                    self._dir_created = True
+                # Write, fsync, then rename: the rename only ever
+                # publishes fully durable bytes, so a crash or power cut
+                # can never leave a truncated settings.json behind
+                tmp = self._path.with_name(self._path.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self._path)
+                logger.info("Settings saved to %s", self._path)
+            except OSError as exc:
+                logger.error("Failed to save settings to %s: %s", self._path, exc)
+
+    @property
+    def pos_version(self) -> int:
+        """Monotonic counter bumped on every settings mutation.
+
+        Plain int read: assignment is atomic under the GIL, no lock.
+        """
+        return self._version
 
     @property
     def pos(self) -> PosSettings:
@@ -107,12 +155,16 @@ class SettingsStore:
                 self._settings.pos.token = token
             if poll_interval is not None:
                 self._settings.pos.poll_interval = max(1, poll_interval)
-            self._save()
-            return PosSettings(
+            self._version += 1
+            data = self._to_dict()
+            updated = PosSettings(
                 url=self._settings.pos.url,
                 token=self._settings.pos.token,
                 poll_interval=self._settings.pos.poll_interval,
             )
+        # Lock released: persist the snapshot without blocking readers
+        self._write(data)
+        return updated
 
     @property
     def pos_configured(self) -> bool:
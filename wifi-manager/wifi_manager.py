@@ -19,28 +19,54 @@ Abhaengigkeiten:
   - NetworkManager (nmcli)
 """
 
-import http.server
+import heapq
+import http.client
 import json
 import logging
+import logging.handlers
+import mmap
 import os
+import queue
+import re
+import shutil
 import signal
+import socket
 import socketserver
+import struct
 import subprocess
 import sys
 import threading
 import time
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import quote
 
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+# Log-Records wandern ueber eine Queue zu einem Hintergrund-Thread:
+# logger.info() in den Handler-Threads kostet dann nur ein put() statt
+# Formatierung + synchronem write, und die Portal-Threads serialisieren
+# sich nicht am Handler-Lock
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+_stderr_handler = logging.StreamHandler()
+_stderr_handler.setFormatter(logging.Formatter(
+    fmt="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-)
+    validate=False,
+))
+
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# Nur-Message-Formatter: prepare() darf den Record nicht vorformatieren,
+# das endgueltige Layout gehoert dem Listener-Handler
+_queue_handler.setFormatter(logging.Formatter("%(message)s", validate=False))
+
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+
+_log_listener = logging.handlers.QueueListener(_log_queue, _stderr_handler)
+_log_listener.start()
+
 logger = logging.getLogger("wifi-manager")
 
 # ---------------------------------------------------------------------------
@@ -54,6 +80,29 @@ PORTAL_PORT = 80
 PORTAL_DIR = Path(__file__).parent / "portal"
 WIFI_INTERFACE = "wlan0"
 
+# Vorkompilierte Muster fuer nmcli-Terse-Ausgaben (bytes-Modus: eine
+# C-Regex-Suche statt splitlines + split pro Zeile)
+_RE_WIFI_CONNECTED = re.compile(rb"(?m)^wifi:connected$")
+_RE_ACTIVE_SSID = re.compile(rb"(?m)^yes:(.*)$")
+_RE_IFACE_PRESENT = re.compile(rb"(?m)^" + WIFI_INTERFACE.encode() + rb":")
+# SSID kann ":" enthalten, daher greedy erste Gruppe (wie rsplit ":", 2)
+_RE_SCAN_LINE = re.compile(rb"(?m)^(.*):(\d*):([^:\n]*)$")
+
+# nmcli einmal absolut aufloesen: mit vollem Pfad, ohne preexec_fn und
+# mit close_fds=False nimmt subprocess intern den posix_spawn-Pfad
+# (vfork) statt fork – erspart das COW-Markieren des gesamten RSS bei
+# jedem der vielen nmcli-Aufrufe
+NMCLI = shutil.which("nmcli") or "/usr/bin/nmcli"
+
+
+def _nmcli(*args: str, timeout: float = 10, text: bool = False):
+    """Fuehrt nmcli mit posix_spawn-tauglichen Parametern aus."""
+    return subprocess.run(
+        [NMCLI, *args],
+        capture_output=True, timeout=timeout, text=text, close_fds=False,
+    )
+
+
 CHECK_INTERVAL = 10          # Sekunden zwischen Konnektivitaets-Checks
 FAILURE_THRESHOLD = 6        # 6 × 10s = 60s ohne WLAN → AP starten
 CONNECT_SETTLE_TIME = 2      # Sekunden Wartezeit nach HTTP-Antwort vor AP-Stopp
@@ -64,8 +113,14 @@ DNSMASQ_CONF_FILE = DNSMASQ_CONF_DIR / "captive-portal.conf"
 # Docker-Compose Verzeichnis (Gateway-Container belegt Port 80)
 DOCKER_COMPOSE_DIR = Path("/opt/iot-gateway")
 
+# Docker Engine API direkt ueber den Unix-Socket: spart pro Stop/Start
+# den Fork der docker-CLI samt Compose-Plugin (~400 ms auf dem Pi)
+DOCKER_SOCKET = "/var/run/docker.sock"
+GATEWAY_LABEL = "com.docker.compose.service=gateway"
+
 # Pfade die Betriebssysteme fuer Captive-Portal-Erkennung pruefen
-CAPTIVE_CHECK_PATHS = {
+# (frozenset: unveraenderlich, Lookup ohne Allokation)
+CAPTIVE_CHECK_PATHS = frozenset({
     "/hotspot-detect.html",          # Apple iOS / macOS
     "/library/test/success.html",    # Apple (aelter)
     "/generate_204",                 # Android / Chrome OS
@@ -76,9 +131,121 @@ CAPTIVE_CHECK_PATHS = {
     "/canonical.html",               # Firefox
     "/success.txt",                  # Diverse
     "/check_network_status.txt",     # Diverse
+})
+
+# Ab dieser Groesse geht der Datei-Body per sendfile(2) direkt aus dem
+# Page-Cache zum Socket (Kernel-zu-Kernel, keine User-Space-Kopie).
+# Kleinere Dateien bleiben als fertige Antwort im Speicher-Cache.
+SENDFILE_MIN_SIZE = 64 * 1024
+
+# Statische Portal-Dateien (einmal gebaut statt pro Request)
+FILE_MAP = {
+    "/": "index.html",
+    "/index.html": "index.html",
+    "/style.css": "style.css",
+    "/app.js": "app.js",
 }
 
 
+# ---------------------------------------------------------------------------
+# rtnetlink (Link-Ereignisse vom Kernel, ohne Zusatzbibliothek)
+# ---------------------------------------------------------------------------
+
+# rtnetlink-Konstanten, die das socket-Modul nicht mitbringt
+_RTMGRP_LINK = 1
+_RTM_NEWLINK = 16
+_RTM_GETLINK = 18
+_NLM_F_REQUEST = 0x01
+_NLM_F_DUMP = 0x300
+_IFLA_IFNAME = 3
+
+
+def _netlink_has_ifname(data: bytes, name: bytes) -> bool:
+    """Sucht in einem Netlink-Paket nach einem RTM_NEWLINK mit diesem Namen."""
+    off = 0
+    while off + 16 <= len(data):
+        # nlmsghdr: len(u32), type(u16), flags(u16), seq(u32), pid(u32)
+        msg_len, msg_type = struct.unpack_from("=IH", data, off)
+        if msg_len < 16 or off + msg_len > len(data):
+            break
+        if msg_type == _RTM_NEWLINK:
+            # Attribute folgen hinter nlmsghdr (16 B) + ifinfomsg (16 B)
+            attr = off + 32
+            end = off + msg_len
+            while attr + 4 <= end:
+                a_len, a_type = struct.unpack_from("=HH", data, attr)
+                if a_len < 4:
+                    break
+                if a_type == _IFLA_IFNAME:
+                    value = data[attr + 4:attr + a_len].split(b"\0", 1)[0]
+                    if value == name:
+                        return True
+                attr += (a_len + 3) & ~3  # rtattr sind 4-Byte-aligned
+        off += (msg_len + 3) & ~3
+    return False
+
+
+def _netlink_wait_for_interface(name: str, timeout: float) -> bool:
+    """Wartet per rtnetlink (RTMGRP_LINK) bis der Kernel das Interface meldet.
+
+    Das Kernel-Event weckt uns in Millisekunden, statt nmcli alle zwei
+    Sekunden zu forken. Wirft OSError/AttributeError, wenn Netlink nicht
+    verfuegbar ist – dann greift der nmcli-Fallback des Aufrufers.
+    """
+    target = name.encode()
+    deadline = time.monotonic() + timeout
+    with socket.socket(
+        socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE
+    ) as sock:
+        sock.bind((0, _RTMGRP_LINK))
+        # Dump aller vorhandenen Links anstossen: faengt den Fall ab,
+        # dass das Interface schon vor dem bind() da war
+        request = struct.pack(
+            "=IHHII", 32, _RTM_GETLINK, _NLM_F_REQUEST | _NLM_F_DUMP, 1, 0,
+        ) + struct.pack("=BxHiII", socket.AF_UNSPEC, 0, 0, 0, 0)
+        sock.send(request)
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            sock.settimeout(remaining)
+            try:
+                data = sock.recv(65536)
+            except TimeoutError:
+                return False
+            if _netlink_has_ifname(data, target):
+                return True
+
+
+# ---------------------------------------------------------------------------
+# systemd-Integration (sd_notify ohne Zusatzbibliothek)
+# ---------------------------------------------------------------------------
+
+def _sd_notify(message: str) -> None:
+    """Schickt eine sd_notify-Nachricht an systemd (no-op ohne Socket)."""
+    addr = os.environ.get("NOTIFY_SOCKET")
+    if not addr:
+        return
+    if addr.startswith("@"):
+        addr = "\0" + addr[1:]  # abstrakter Unix-Socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.connect(addr)
+            sock.sendall(message.encode())
+    except OSError as exc:
+        logger.debug("sd_notify fehlgeschlagen: %s", exc)
+
+
+def _watchdog_interval() -> float:
+    """Halbe WatchdogSec aus der Unit, oder 0 wenn kein Watchdog aktiv."""
+    try:
+        usec = int(os.environ.get("WATCHDOG_USEC", "0"))
+    except ValueError:
+        return 0.0
+    return usec / 2_000_000  # Haelfte, in Sekunden
+
+
 # ---------------------------------------------------------------------------
 # WiFi Manager
 # ---------------------------------------------------------------------------
@@ -86,6 +253,25 @@ CAPTIVE_CHECK_PATHS = {
 class WifiManager:
     """Verwaltet WLAN-Konnektivitaet und Access-Point-Modus."""
 
+    # Feste Attributmenge: Zugriffe im heissen /api/wifi/status-Pfad
+    # werden zu Slot-Loads statt Dict-Lookups
+    __slots__ = (
+        "_ap_active",
+        "_portal_active",
+        "_server",
+        "_server_thread",
+        "_running",
+        "_connecting",
+        "_disconnected_since",
+        "_check_event",
+        "_monitor_proc",
+        "_last_error",
+        "_scan_cache",
+        "_scan_time",
+        "_scan_lock",
+        "_gateway_id",
+    )
+
     def __init__(self) -> None:
         self._ap_active = False
         self._portal_active = False
@@ -93,23 +279,28 @@ class WifiManager:
         self._server_thread: threading.Thread | None = None
         self._running = True
         self._connecting = False
-        self._consecutive_failures = 0
+        # Zeitpunkt seit dem das WLAN ununterbrochen weg ist (monotonic),
+        # None = verbunden. Wanduhr statt Zaehler, damit ereignisgetriebene
+        # Extra-Pruefungen die 60s-Schwelle nicht verfaelschen
+        self._disconnected_since: float | None = None
+        self._check_event = threading.Event()
+        self._monitor_proc: subprocess.Popen | None = None
         self._last_error: str = ""
+        # Scan-Ergebnisse kurz cachen: jeder Portal-Seitenaufruf fragt
+        # /api/wifi/scan an, und ein echter Rescan blockiert sekundenlang
+        self._scan_cache: list[dict] = []
+        self._scan_time = 0.0
+        self._scan_lock = threading.Lock()
+        # Container-ID des Gateways (einmal aufgeloest, s. _gateway_via_api)
+        self._gateway_id: str | None = None
 
     # --- Konnektivitaet ---
 
     def is_wifi_connected(self) -> bool:
         """Prueft ob eine aktive WLAN-Verbindung besteht."""
         try:
-            result = subprocess.run(
-                ["nmcli", "-t", "-f", "TYPE,STATE", "dev"],
-                capture_output=True, text=True, timeout=10,
-            )
-            for line in result.stdout.strip().splitlines():
-                parts = line.split(":")
-                if len(parts) >= 2 and parts[0] == "wifi" and parts[1] == "connected":
-                    return True
-            return False
+            result = _nmcli("-t", "-f", "TYPE,STATE", "dev")
+            return _RE_WIFI_CONNECTED.search(result.stdout) is not None
         except Exception as exc:
             logger.error("WLAN-Status-Pruefung fehlgeschlagen: %s", exc)
             return False
@@ -117,64 +308,67 @@ class WifiManager:
     def get_current_ssid(self) -> str:
         """Gibt die aktuell verbundene SSID zurueck, oder leer."""
         try:
-            result = subprocess.run(
-                ["nmcli", "-t", "-f", "ACTIVE,SSID", "dev", "wifi"],
-                capture_output=True, text=True, timeout=10,
-            )
-            for line in result.stdout.strip().splitlines():
-                parts = line.split(":", 1)
-                if len(parts) == 2 and parts[0] == "yes":
-                    return parts[1]
-            return ""
+            result = _nmcli("-t", "-f", "ACTIVE,SSID", "dev", "wifi")
+            match = _RE_ACTIVE_SSID.search(result.stdout)
+            return match.group(1).decode("utf-8", "replace") if match else ""
         except Exception:
             return ""
 
     # --- WLAN-Scan ---
 
+    # Wie lange ein Scan-Ergebnis als frisch gilt (Sekunden)
+    SCAN_MAX_AGE = 10
+    # Mehr Netze zeigt das Portal ohnehin nicht sinnvoll an
+    SCAN_MAX_RESULTS = 25
+
     def scan_networks(self) -> list[dict]:
-        """Scannt verfuegbare WLAN-Netzwerke."""
-        try:
-            # Rescan ausloesen
-            subprocess.run(
-                ["nmcli", "dev", "wifi", "rescan", "ifname", WIFI_INTERFACE],
-                capture_output=True, timeout=15,
-            )
-            time.sleep(2)
+        """Scannt verfuegbare WLAN-Netzwerke (gecacht, max. SCAN_MAX_AGE s alt)."""
+        with self._scan_lock:
+            if (
+                self._scan_cache
+                and time.monotonic() - self._scan_time < self.SCAN_MAX_AGE
+            ):
+                return self._scan_cache
 
-            result = subprocess.run(
-                [
-                    "nmcli", "-t", "-f", "SSID,SIGNAL,SECURITY",
-                    "dev", "wifi", "list", "--rescan", "no",
-                ],
-                capture_output=True, text=True, timeout=10,
+        try:
+            # Ein einziger nmcli-Aufruf: --rescan yes scannt und wartet
+            # selbst auf das Ergebnis, statt rescan + sleep(2) + list
+            result = _nmcli(
+                "-t", "-f", "SSID,SIGNAL,SECURITY",
+                "dev", "wifi", "list", "ifname", WIFI_INTERFACE,
+                "--rescan", "yes",
+                timeout=20,
             )
 
-            networks: list[dict] = []
-            seen: set[str] = set()
-
-            for line in result.stdout.strip().splitlines():
-                if not line.strip():
+            # Dedup und Bestwert in einem Durchlauf: pro SSID bleibt
+            # der staerkste Messwert, statt Seen-Set plus Voll-Sort
+            best: dict[str, tuple[int, str]] = {}
+            for match in _RE_SCAN_LINE.finditer(result.stdout):
+                ssid = match.group(1).decode("utf-8", "replace").strip()
+                if not ssid or ssid == AP_SSID:
                     continue
-                # SSID kann ":" enthalten → rsplit mit maxsplit=2
-                parts = line.rsplit(":", 2)
-                if len(parts) < 3:
-                    continue
-
-                ssid = parts[0].strip()
-                signal_str = parts[1].strip()
-                security = parts[2].strip()
-
-                if not ssid or ssid in seen or ssid == AP_SSID:
-                    continue
-                seen.add(ssid)
-
-                networks.append({
+                signal_bytes = match.group(2)
+                signal = int(signal_bytes) if signal_bytes else 0
+                entry = best.get(ssid)
+                if entry is None or signal > entry[0]:
+                    security = match.group(3).decode("utf-8", "replace").strip()
+                    best[ssid] = (signal, security)
+
+            # Nur die staerksten Netze behalten: nlargest kostet
+            # O(n log k) statt eines Voll-Sorts ueber alle Zeilen
+            networks: list[dict] = [
+                {
                     "ssid": ssid,
-                    "signal": int(signal_str) if signal_str.isdigit() else 0,
+                    "signal": signal,
                     "security": security if security != "--" else "Offen",
-                })
-
-            networks.sort(key=lambda x: x["signal"], reverse=True)
+                }
+                for ssid, (signal, security) in heapq.nlargest(
+                    self.SCAN_MAX_RESULTS, best.items(), key=lambda kv: kv[1][0]
+                )
+            ]
+            with self._scan_lock:
+                self._scan_cache = networks
+                self._scan_time = time.monotonic()
             return networks
 
         except Exception as exc:
@@ -199,25 +393,24 @@ class WifiManager:
             # Warten bis HTTP-Antwort beim Client angekommen ist
             time.sleep(CONNECT_SETTLE_TIME)
 
-            # Portal und AP stoppen
+            # Portal und AP stoppen. nmcli connection down/delete sind
+            # synchron, danach ist das Interface sofort wieder frei –
+            # keine zusaetzliche Wartezeit noetig
             self.stop_portal()
             self.stop_ap()
-            time.sleep(1)
 
             # Verbindung herstellen
-            cmd = ["nmcli", "dev", "wifi", "connect", ssid]
+            cmd = ["dev", "wifi", "connect", ssid]
             if password:
                 cmd += ["password", password]
             cmd += ["ifname", WIFI_INTERFACE]
 
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, timeout=30,
-            )
+            result = _nmcli(*cmd, timeout=30, text=True)
 
             if result.returncode == 0:
                 logger.info("Erfolgreich verbunden mit '%s'", ssid)
                 self._last_error = ""
-                self._consecutive_failures = 0
+                self._disconnected_since = None
                 # AP bleibt aus, WLAN ist verbunden
                 return
 
@@ -243,7 +436,6 @@ class WifiManager:
             if not self.is_wifi_connected():
                 logger.info("Verbindung fehlgeschlagen – AP wird neu gestartet")
                 self.start_ap()
-                time.sleep(2)
                 self.start_portal()
 
     # --- Access Point ---
@@ -257,26 +449,21 @@ class WifiManager:
             self._setup_dns_redirect()
 
             # Alte AP-Verbindung loeschen falls vorhanden
-            subprocess.run(
-                ["nmcli", "connection", "delete", AP_CON_NAME],
-                capture_output=True, timeout=10,
-            )
+            _nmcli("connection", "delete", AP_CON_NAME)
 
             # Neue AP-Verbindung anlegen (offen, kein Passwort)
-            result = subprocess.run(
-                [
-                    "nmcli", "connection", "add",
-                    "type", "wifi",
-                    "ifname", WIFI_INTERFACE,
-                    "con-name", AP_CON_NAME,
-                    "autoconnect", "no",
-                    "ssid", AP_SSID,
-                    "802-11-wireless.mode", "ap",
-                    "802-11-wireless.band", "bg",
-                    "ipv4.method", "shared",
-                    "ipv4.addresses", f"{AP_IP}/24",
-                ],
-                capture_output=True, text=True, timeout=15,
+            result = _nmcli(
+                "connection", "add",
+                "type", "wifi",
+                "ifname", WIFI_INTERFACE,
+                "con-name", AP_CON_NAME,
+                "autoconnect", "no",
+                "ssid", AP_SSID,
+                "802-11-wireless.mode", "ap",
+                "802-11-wireless.band", "bg",
+                "ipv4.method", "shared",
+                "ipv4.addresses", f"{AP_IP}/24",
+                timeout=15, text=True,
             )
 
             if result.returncode != 0:
@@ -284,10 +471,7 @@ class WifiManager:
                 return
 
             # Verbindung aktivieren
-            result = subprocess.run(
-                ["nmcli", "connection", "up", AP_CON_NAME],
-                capture_output=True, text=True, timeout=15,
-            )
+            result = _nmcli("connection", "up", AP_CON_NAME, timeout=15, text=True)
 
             if result.returncode == 0:
                 self._ap_active = True
@@ -304,14 +488,8 @@ class WifiManager:
             return
 
         try:
-            subprocess.run(
-                ["nmcli", "connection", "down", AP_CON_NAME],
-                capture_output=True, timeout=10,
-            )
-            subprocess.run(
-                ["nmcli", "connection", "delete", AP_CON_NAME],
-                capture_output=True, timeout=10,
-            )
+            _nmcli("connection", "down", AP_CON_NAME)
+            _nmcli("connection", "delete", AP_CON_NAME)
             self._ap_active = False
             logger.info("Access-Point gestoppt")
         except Exception as exc:
@@ -328,8 +506,63 @@ class WifiManager:
 
     # --- Docker Gateway Container (belegt Port 80) ---
 
+    def _lookup_gateway_id(self) -> str | None:
+        """Sucht die Container-ID des Gateways ueber die Engine-API."""
+        filters = quote(json.dumps({"label": [GATEWAY_LABEL]}))
+        conn = _UnixHTTPConnection(DOCKER_SOCKET, timeout=10)
+        try:
+            conn.request("GET", f"/containers/json?all=true&filters={filters}")
+            resp = conn.getresponse()
+            containers = json.loads(resp.read())
+        finally:
+            conn.close()
+        if resp.status != 200 or not containers:
+            return None
+        return containers[0].get("Id")
+
+    def _gateway_via_api(self, action: str, query: str = "") -> bool:
+        """Stoppt/startet den Gateway-Container ueber die Engine-API.
+
+        Returns:
+            True bei Erfolg, False wenn der Socket nicht erreichbar ist
+            oder die API ablehnt (dann greift der CLI-Fallback).
+        """
+        try:
+            if self._gateway_id is None:
+                self._gateway_id = self._lookup_gateway_id()
+            if self._gateway_id is None:
+                return False
+
+            conn = _UnixHTTPConnection(DOCKER_SOCKET, timeout=30)
+            try:
+                url = f"/containers/{self._gateway_id}/{action}"
+                if query:
+                    url += f"?{query}"
+                conn.request("POST", url)
+                resp = conn.getresponse()
+                resp.read()
+            finally:
+                conn.close()
+
+            # 204 = ausgefuehrt, 304 = war schon im Zielzustand
+            if resp.status in (204, 304):
+                logger.info("Docker Gateway Container: %s via Engine-API", action)
+                return True
+            # z.B. 404 nach Neuerstellung → ID verwerfen, CLI-Fallback
+            self._gateway_id = None
+            logger.warning(
+                "Engine-API %s fehlgeschlagen (HTTP %d)", action, resp.status,
+            )
+            return False
+        except (OSError, ValueError) as exc:
+            logger.debug("Docker Engine-API nicht erreichbar: %s", exc)
+            return False
+
     def _stop_gateway_container(self) -> None:
         """Stoppt den Docker Gateway Container um Port 80 freizugeben."""
+        if self._gateway_via_api("stop", "t=5"):
+            return
+
         compose_file = DOCKER_COMPOSE_DIR / "docker-compose.yml"
         if not compose_file.exists():
             return
@@ -349,6 +582,9 @@ class WifiManager:
 
     def _start_gateway_container(self) -> None:
         """Startet den Docker Gateway Container nach Portal-Stopp."""
+        if self._gateway_via_api("start"):
+            return
+
         compose_file = DOCKER_COMPOSE_DIR / "docker-compose.yml"
         if not compose_file.exists():
             return
@@ -377,9 +613,10 @@ class WifiManager:
         if self._server is not None:
             return
 
-        # Gateway Container stoppen um Port 80 freizugeben
+        # Gateway Container stoppen um Port 80 freizugeben; dank
+        # SO_REUSEPORT (s. _ReusableTCPServer) ist danach keine
+        # Wartezeit auf die Socket-Freigabe mehr noetig
         self._stop_gateway_container()
-        time.sleep(1)
 
         try:
             handler = _make_handler(self)
@@ -402,6 +639,15 @@ class WifiManager:
         """Stoppt den HTTP-Server und startet den Gateway Container wieder."""
         if self._server:
             self._server.shutdown()
+            # sendfile-fds und Mappings freigeben: _make_handler oeffnet
+            # sie beim naechsten Portal-Start neu
+            for fd, mm in self._server.RequestHandlerClass._sendfile_resources:
+                if mm is not None:
+                    mm.close()
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
             self._server = None
             self._server_thread = None
             logger.info("Captive-Portal gestoppt")
@@ -411,6 +657,40 @@ class WifiManager:
         # Gateway Container wieder starten
         self._start_gateway_container()
 
+    # --- Netzwerk-Ereignisse ---
+
+    def _start_monitor(self) -> None:
+        """Startet einen Thread der `nmcli monitor` liest.
+
+        Jede gemeldete Aenderung weckt die Hauptschleife sofort auf,
+        statt bis zu CHECK_INTERVAL auf den naechsten Tick zu warten.
+        Faellt nmcli monitor aus, laeuft die Schleife einfach im
+        10-Sekunden-Takt weiter.
+        """
+
+        def _monitor() -> None:
+            while self._running:
+                try:
+                    self._monitor_proc = subprocess.Popen(
+                        [NMCLI, "monitor"],
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        text=True,
+                        close_fds=False,
+                    )
+                    assert self._monitor_proc.stdout is not None
+                    for _line in self._monitor_proc.stdout:
+                        if not self._running:
+                            return
+                        self._check_event.set()
+                except Exception as exc:
+                    logger.warning("nmcli monitor nicht verfuegbar: %s", exc)
+                    return
+                # Prozess beendet (z.B. NetworkManager-Neustart) → neu starten
+                time.sleep(5)
+
+        threading.Thread(target=_monitor, daemon=True, name="nm-monitor").start()
+
     # --- Hauptschleife ---
 
     def run(self) -> None:
@@ -422,35 +702,55 @@ class WifiManager:
 
         # Warten bis WLAN-Interface bereit ist
         self._wait_for_interface()
+        _sd_notify("READY=1")
+
+        # Ereignisgetriebene Aufwecker fuer die Schleife
+        self._start_monitor()
+
+        # Watchdog-Pings, damit systemd einen haengenden Manager erkennt
+        # und neu startet (WatchdogSec in der Unit)
+        watchdog_interval = _watchdog_interval()
+        next_ping = 0.0
 
         while self._running:
             try:
+                if watchdog_interval and time.monotonic() >= next_ping:
+                    _sd_notify("WATCHDOG=1")
+                    next_ping = time.monotonic() + watchdog_interval
+
                 if self._connecting:
-                    time.sleep(2)
+                    # Verbindungsversuch laeuft in seinem Thread; ein
+                    # nmcli-Ereignis weckt uns frueher als der Timeout
+                    if self._check_event.wait(2):
+                        self._check_event.clear()
                     continue
 
                 connected = self.is_wifi_connected()
 
                 if connected:
-                    self._consecutive_failures = 0
+                    self._disconnected_since = None
 
                     if self._ap_active:
                         logger.info("WLAN verbunden – Access-Point wird gestoppt")
                         self.stop_portal()
                         self.stop_ap()
                 else:
-                    self._consecutive_failures += 1
+                    now = time.monotonic()
+                    if self._disconnected_since is None:
+                        self._disconnected_since = now
+                    offline_for = now - self._disconnected_since
 
                     if (
-                        self._consecutive_failures >= FAILURE_THRESHOLD
+                        offline_for >= FAILURE_THRESHOLD * CHECK_INTERVAL
                         and not self._ap_active
                     ):
                         logger.info(
                             "Kein WLAN seit %ds – Access-Point wird gestartet",
-                            self._consecutive_failures * CHECK_INTERVAL,
+                            int(offline_for),
                         )
+                        # nmcli connection up blockiert bis der AP
+                        # aktiv ist, das Portal kann direkt starten
                         self.start_ap()
-                        time.sleep(2)
                         self.start_portal()
 
                     elif self._ap_active and not self._portal_active:
@@ -459,25 +759,42 @@ class WifiManager:
                         logger.info("AP aktiv aber Portal nicht – Retry Portal-Start")
                         self.start_portal()
 
-                time.sleep(CHECK_INTERVAL)
+                # Naechster Tick: sofort bei nmcli-Ereignis, sonst
+                # spaetestens nach CHECK_INTERVAL
+                if self._check_event.wait(CHECK_INTERVAL):
+                    self._check_event.clear()
 
             except Exception as exc:
                 logger.error("Hauptschleifen-Fehler: %s", exc)
-                time.sleep(CHECK_INTERVAL)
+                self._check_event.wait(CHECK_INTERVAL)
+                self._check_event.clear()
 
     def _wait_for_interface(self) -> None:
-        """Wartet bis das WLAN-Interface in nmcli sichtbar ist."""
+        """Wartet bis das WLAN-Interface verfuegbar ist.
+
+        Ereignisgetrieben ueber rtnetlink: der Kernel meldet den Link,
+        sobald der Treiber geladen ist, typischerweise Sekunden bevor
+        die erste nmcli-Abfrage ihn gesehen haette. Nur wenn Netlink
+        nicht verfuegbar ist, pollt die alte nmcli-Schleife.
+        """
+        try:
+            if _netlink_wait_for_interface(WIFI_INTERFACE, 60):
+                logger.info("WLAN-Interface '%s' bereit", WIFI_INTERFACE)
+            else:
+                logger.warning(
+                    "WLAN-Interface '%s' nicht gefunden – WiFi-Manager wird trotzdem gestartet",
+                    WIFI_INTERFACE,
+                )
+            return
+        except (OSError, AttributeError) as exc:
+            logger.debug("rtnetlink nicht verfuegbar (%s) – nmcli-Fallback", exc)
+
         for attempt in range(30):
             try:
-                result = subprocess.run(
-                    ["nmcli", "-t", "-f", "DEVICE,TYPE", "dev"],
-                    capture_output=True, text=True, timeout=10,
-                )
-                for line in result.stdout.strip().splitlines():
-                    parts = line.split(":")
-                    if len(parts) >= 2 and parts[0] == WIFI_INTERFACE:
-                        logger.info("WLAN-Interface '%s' bereit", WIFI_INTERFACE)
-                        return
+                result = _nmcli("-t", "-f", "DEVICE,TYPE", "dev")
+                if _RE_IFACE_PRESENT.search(result.stdout):
+                    logger.info("WLAN-Interface '%s' bereit", WIFI_INTERFACE)
+                    return
             except Exception:
                 pass
 
@@ -493,9 +810,16 @@ class WifiManager:
     def shutdown(self) -> None:
         """Sauberes Herunterfahren."""
         logger.info("WiFi Manager wird beendet...")
+        _sd_notify("STOPPING=1")
         self._running = False
+        if self._monitor_proc is not None:
+            try:
+                self._monitor_proc.terminate()
+            except OSError:
+                pass
         self.stop_portal()
         self.stop_ap()
+        _log_listener.stop()  # gepufferte Log-Records noch rausschreiben
         sys.exit(0)
 
 
@@ -503,151 +827,284 @@ class WifiManager:
 # HTTP Server
 # ---------------------------------------------------------------------------
 
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP-Verbindung ueber einen Unix-Socket (Docker Engine API)."""
+
+    def __init__(self, socket_path: str, timeout: float = 30) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._socket_path)
+        self.sock = sock
+
+
 class _ReusableTCPServer(socketserver.ThreadingTCPServer):
     """TCP-Server mit Adress-Wiederverwendung und Daemon-Threads."""
     allow_reuse_address = True
     daemon_threads = True
 
+    def server_bind(self) -> None:
+        # SO_REUSEPORT vor dem bind(): Port 80 laesst sich sofort
+        # uebernehmen, ohne auf das vollstaendige Schliessen des
+        # Gateway-Sockets warten zu muessen
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        except (AttributeError, OSError):
+            pass  # Option nicht verfuegbar → normales bind reicht
+        super().server_bind()
+
 
 def _make_handler(manager: WifiManager):
     """Erzeugt einen HTTP-Request-Handler mit Zugriff auf den WifiManager."""
 
-    class CaptivePortalHandler(http.server.BaseHTTPRequestHandler):
+    # Portal-Dateien einmal beim Portal-Start in den Speicher laden:
+    # die Probe-Flut nach dem Verbinden trifft immer dieselben paar KB,
+    # pro Request bleiben damit null Datei-Syscalls uebrig
+    content_types = {
+        ".html": "text/html",
+        ".css": "text/css",
+        ".js": "application/javascript",
+    }
+    # Pro Route liegt die komplette HTTP-Antwort (Statuszeile, Header,
+    # Body) als ein fertiger bytes-Block bereit: ein write = ein
+    # send()-Syscall = ein TCP-Segment-Burst, wichtig auf dem langsamen
+    # AP-Funk
+    static_cache: dict[str, bytes] = {}
+    # Grosse Assets: nur der Header liegt im Speicher, der Body geht per
+    # sendfile(2) zero-copy aus dem Page-Cache auf den Socket. Der fd
+    # bleibt offen, und die MAP_POPULATE-Mapping haelt die Seiten schon
+    # beim Portal-Start warm, damit der erste Request nicht auf die
+    # langsame SD-Karte warten muss.
+    sendfile_cache: dict[str, tuple[bytes, int, int, mmap.mmap | None]] = {}
+    for route, filename in FILE_MAP.items():
+        filepath = PORTAL_DIR / filename
+        try:
+            size = filepath.stat().st_size
+        except OSError:
+            logger.warning("Portal-Datei fehlt: %s", filepath)
+            continue
+        content_type = content_types.get(filepath.suffix, "text/plain")
+        head = (
+            f"HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {size}\r\n"
+            f"Cache-Control: no-cache, no-store\r\n"
+            f"Connection: close\r\n\r\n"
+        ).encode("latin-1")
+        try:
+            if size >= SENDFILE_MIN_SIZE:
+                fd = os.open(filepath, os.O_RDONLY)
+                try:
+                    mm = mmap.mmap(
+                        fd, size, prot=mmap.PROT_READ,
+                        flags=mmap.MAP_SHARED | getattr(mmap, "MAP_POPULATE", 0),
+                    )
+                except (OSError, ValueError):
+                    mm = None  # sendfile liest dann eben von der Karte
+                sendfile_cache[route] = (head, fd, size, mm)
+            else:
+                static_cache[route] = head + filepath.read_bytes()
+        except OSError:
+            logger.warning("Portal-Datei fehlt: %s", filepath)
+
+    # 302-Antwort fuer Captive-Probes ebenfalls vorgebaut
+    redirect_response = (
+        f"HTTP/1.1 302 Found\r\n"
+        f"Location: http://{AP_IP}/\r\n"
+        f"Content-Length: 0\r\n"
+        f"Connection: close\r\n\r\n"
+    ).encode("latin-1")
+
+    notfound_response = (
+        b"HTTP/1.1 404 Not Found\r\n"
+        b"Content-Length: 0\r\n"
+        b"Connection: close\r\n\r\n"
+    )
+
+    status_texts = {200: "OK", 400: "Bad Request"}
+
+    class CaptivePortalHandler(socketserver.StreamRequestHandler):
+        """Minimaler HTTP/1.1-Handler fuer die wenigen Portal-Routen.
+
+        BaseHTTPRequestHandler traegt pro Request erheblichen
+        Python-Overhead (Versionsbehandlung, Header-Objekte, Logging),
+        von dem das Portal nichts braucht. Hier: Request-Zeile lesen,
+        Header in ein kleines Dict, Body per Content-Length, fertige
+        Antwort in einem write rausschreiben.
+        """
 
-        def log_message(self, fmt, *args):
-            logger.debug(fmt, *args)
+        # TCP_NODELAY auf jedem akzeptierten Socket: ohne Nagle geht die
+        # kleine 302-Antwort sofort raus, statt ~40 ms auf ein ACK des
+        # Probe-Clients zu warten
+        disable_nagle_algorithm = True
 
-        # --- GET ---
+        def handle(self) -> None:
+            try:
+                request_line = self.rfile.readline(8192)
+                parts = request_line.split()
+                if len(parts) < 2:
+                    return
+                method = parts[0]
+
+                # Header einsammeln (begrenzt, nur Name → Wert)
+                headers: dict[bytes, bytes] = {}
+                for _ in range(100):
+                    line = self.rfile.readline(8192)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, sep, value = line.partition(b":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                path = (
+                    parts[1].decode("latin-1", "replace").partition("?")[0].lower()
+                )
 
-        def do_GET(self):  # noqa: N802
-            path = urlparse(self.path).path.lower()
+                if method == b"GET":
+                    # Captive-Portal-Erkennung → Redirect zum Portal
+                    if path in CAPTIVE_CHECK_PATHS:
+                        self.wfile.write(redirect_response)
+                        return
+                    # Eine Hash-Suche statt if-Kette: Pfad → Handler.
+                    # Alles Unbekannte → Portal (hilft der Erkennung)
+                    fn = self._ROUTES.get(path)
+                    if fn is not None:
+                        fn(self)
+                    else:
+                        self.wfile.write(redirect_response)
+                    return
 
-            # Captive-Portal-Erkennung → Redirect zum Portal
-            if path in CAPTIVE_CHECK_PATHS:
-                self._redirect_to_portal()
-                return
+                if method == b"POST" and path == "/api/wifi/connect":
+                    self._handle_connect(headers)
+                    return
 
-            # API-Endpunkte
-            if path == "/api/wifi/scan":
-                networks = manager.scan_networks()
-                self._json_response({"networks": networks})
-                return
+                self.wfile.write(notfound_response)
+            except OSError:
+                pass  # Client hat aufgelegt – beim Portal voellig normal
 
-            if path == "/api/wifi/status":
-                self._json_response({
-                    "connected": manager.is_wifi_connected(),
-                    "ap_active": manager._ap_active,
-                    "connecting": manager._connecting,
-                    "last_error": manager._last_error,
-                    "current_ssid": manager.get_current_ssid(),
-                })
-                return
+        # --- GET ---
 
-            # Statische Dateien
-            file_map = {
-                "/": "index.html",
-                "/index.html": "index.html",
-                "/style.css": "style.css",
-                "/app.js": "app.js",
-            }
-
-            filename = file_map.get(path)
-            if filename:
-                content_types = {
-                    ".html": "text/html",
-                    ".css": "text/css",
-                    ".js": "application/javascript",
-                }
-                ext = Path(filename).suffix
-                self._serve_file(filename, content_types.get(ext, "text/plain"))
-                return
+        def _handle_scan(self):
+            self._json_response({"networks": manager.scan_networks()})
 
-            # Alles andere → Portal (hilft bei Captive-Portal-Erkennung)
-            self._redirect_to_portal()
+        def _handle_status(self):
+            self._json_response({
+                "connected": manager.is_wifi_connected(),
+                "ap_active": manager._ap_active,
+                "connecting": manager._connecting,
+                "last_error": manager._last_error,
+                "current_ssid": manager.get_current_ssid(),
+            })
 
         # --- POST ---
 
-        def do_POST(self):  # noqa: N802
-            path = urlparse(self.path).path
-
-            if path == "/api/wifi/connect":
-                try:
-                    content_length = int(self.headers.get("Content-Length", 0))
-                except (ValueError, TypeError):
-                    self._json_response(
-                        {"success": False, "message": "Ungueltige Anfrage"}, 400,
-                    )
-                    return
-
-                try:
-                    raw = self.rfile.read(content_length)
-                    body = raw.decode("utf-8")
-                except (UnicodeDecodeError, OSError):
-                    self._json_response(
-                        {"success": False, "message": "Ungueltige Zeichenkodierung"}, 400,
-                    )
-                    return
+        def _handle_connect(self, headers: dict) -> None:
+            try:
+                content_length = int(headers.get(b"content-length", 0))
+            except (ValueError, TypeError):
+                self._json_response(
+                    {"success": False, "message": "Ungueltige Anfrage"}, 400,
+                )
+                return
 
-                try:
-                    data = json.loads(body)
-                except (json.JSONDecodeError, ValueError):
-                    self._json_response(
-                        {"success": False, "message": "Ungueltige Anfrage"}, 400,
-                    )
-                    return
+            try:
+                raw = self.rfile.read(content_length)
+                body = raw.decode("utf-8")
+            except (UnicodeDecodeError, OSError):
+                self._json_response(
+                    {"success": False, "message": "Ungueltige Zeichenkodierung"}, 400,
+                )
+                return
 
-                ssid = data.get("ssid", "").strip()
-                password = data.get("password", "").strip()
+            try:
+                data = json.loads(body)
+            except (json.JSONDecodeError, ValueError):
+                self._json_response(
+                    {"success": False, "message": "Ungueltige Anfrage"}, 400,
+                )
+                return
 
-                if not ssid:
-                    self._json_response(
-                        {"success": False, "message": "Kein Netzwerk ausgewaehlt"},
-                    )
-                    return
+            ssid = data.get("ssid", "").strip()
+            password = data.get("password", "").strip()
 
-                # Verbindung im Hintergrund starten
-                manager._last_error = ""
-                manager.connect_async(ssid, password)
-
-                self._json_response({
-                    "success": True,
-                    "message": (
-                        f"Verbindung zu '{ssid}' wird hergestellt... "
-                        "Sie werden gleich vom Netzwerk getrennt."
-                    ),
-                })
+            if not ssid:
+                self._json_response(
+                    {"success": False, "message": "Kein Netzwerk ausgewaehlt"},
+                )
                 return
 
-            self.send_error(404)
+            # Verbindung im Hintergrund starten
+            manager._last_error = ""
+            manager.connect_async(ssid, password)
+
+            self._json_response({
+                "success": True,
+                "message": (
+                    f"Verbindung zu '{ssid}' wird hergestellt... "
+                    "Sie werden gleich vom Netzwerk getrennt."
+                ),
+            })
 
         # --- Hilfsmethoden ---
 
         def _redirect_to_portal(self):
-            self.send_response(302)
-            self.send_header("Location", f"http://{AP_IP}/")
-            self.end_headers()
-
-        def _serve_file(self, filename: str, content_type: str):
-            filepath = PORTAL_DIR / filename
-            if not filepath.exists():
-                self.send_error(404)
-                return
-            content = filepath.read_bytes()
-            self.send_response(200)
-            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
-            self.send_header("Content-Length", str(len(content)))
-            self.send_header("Cache-Control", "no-cache, no-store")
-            self.end_headers()
-            self.wfile.write(content)
+            self.wfile.write(redirect_response)
 
         def _json_response(self, data: dict, status: int = 200):
             body = json.dumps(data, ensure_ascii=False).encode("utf-8")
-            self.send_response(status)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.send_header("Content-Length", str(len(body)))
-            self.send_header("Cache-Control", "no-cache")
-            self.end_headers()
-            self.wfile.write(body)
+            head = (
+                f"HTTP/1.1 {status} {status_texts.get(status, 'OK')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Cache-Control: no-cache\r\n"
+                f"Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            self.wfile.write(head + body)
+
+    def _static_route(response: bytes):
+        # Vorgebaute Antwort als Closure: Dispatch-Treffer → ein write
+        def serve(self) -> None:
+            self.wfile.write(response)
+        return serve
+
+    def _sendfile_route(head: bytes, fd: int, size: int, _mm):
+        # _mm wird nur referenziert, damit das MAP_POPULATE-Mapping (und
+        # damit die vorgeladenen Seiten) am Leben bleibt
+        def serve(self) -> None:
+            # Header normal senden, Body per os.sendfile direkt vom fd:
+            # der Kernel kopiert die Seiten aus dem Page-Cache zum
+            # Socket. Expliziter Offset, damit parallele Handler-Threads
+            # sich nicht ueber eine Dateiposition in die Quere kommen.
+            self.connection.sendall(head)
+            sock_fd = self.connection.fileno()
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(sock_fd, fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        return serve
+
+    # Routen-Tabelle einmal beim Portal-Start bauen: do_GET macht dann
+    # pro Request nur noch eine Hash-Suche statt einer if-Kette mit
+    # mehreren Cache-Lookups
+    routes = {
+        "/api/wifi/scan": CaptivePortalHandler._handle_scan,
+        "/api/wifi/status": CaptivePortalHandler._handle_status,
+    }
+    for route, response in static_cache.items():
+        routes[route] = _static_route(response)
+    for route, pair in sendfile_cache.items():
+        routes[route] = _sendfile_route(*pair)
+    CaptivePortalHandler._ROUTES = routes
+    # Offene fds/Mappings am Handler festhalten, damit stop_portal sie
+    # wieder schliessen kann – sonst leckt jeder AP-Zyklus einen Satz
+    CaptivePortalHandler._sendfile_resources = [
+        (fd, mm) for _head, fd, _size, mm in sendfile_cache.values()
+    ]
 
     return CaptivePortalHandler
 